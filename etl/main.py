@@ -15,6 +15,11 @@ import numpy as np
 import sqlalchemy
 from sqlalchemy import create_engine, text
 import urllib.parse
+import re
+import subprocess
+import tempfile
+import shutil
+import functools
 import sys
 import os
 
@@ -23,6 +28,68 @@ SERVER = 'localhost'
 DATABASE = 'db_superstore'
 DRIVER = 'ODBC Driver 17 for SQL Server'
 CSV_PATH = 'superstore.csv' # Assumes script is run from project root or path is relative
+BCP_PATH = 'bcp' # SQL Server bulk copy utility; set to None to always load Fact_Sales via executemany
+
+# Characters replaced by '_' when normalizing column names
+_COL_NORM = re.compile(r'[.\s\-]')
+
+# Batch separator lines in SQL scripts
+_GO_SEP = re.compile(r'^\s*GO\s*$', re.IGNORECASE | re.MULTILINE)
+
+# Date columns (normalized names) parsed while reading the CSV
+DATE_COLS = ['order_date', 'ship_date']
+
+# Columns (normalized names) read in the first pass to build the dimensions;
+# sales is included for the global order-value threshold
+DIM_SRC_COLS = [
+    'order_date', 'customer_id', 'customer_name', 'segment',
+    'product_id', 'product_name', 'category', 'sub_category', 'ship_mode',
+    'city', 'state', 'country', 'region', 'market', 'postal_code', 'sales'
+]
+
+# Columns (normalized names) streamed in chunks to build Fact_Sales
+FACT_SRC_COLS = [
+    'row_id', 'order_id', 'order_date', 'ship_date', 'customer_id', 'product_id', 'ship_mode',
+    'city', 'state', 'country', 'region', 'market', 'postal_code',
+    'sales', 'quantity', 'discount', 'profit', 'shipping_cost'
+]
+CHUNK_SIZE = 50_000
+
+# Integer columns downcast to the smallest dtype that holds their values (checked,
+# so nothing wraps). IDs stay int64 to match BIGINT; money/ratio columns stay
+# float64 so values are not rounded before reaching the FLOAT columns.
+DOWNCAST_INT_COLS = ['quantity']
+
+# Low-cardinality string columns stored as pandas categoricals
+CATEGORY_COLS = [
+    'segment', 'category', 'sub_category', 'ship_mode', 'region', 'market',
+    'discount_category', 'order_value_segment', 'country', 'state'
+]
+
+# Prefer the multithreaded Arrow CSV reader when pyarrow is installed
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    pa = pc = pa_csv = None
+    CSV_ENGINE = 'c'
+
+# Explicit Arrow types (normalized names) for the streamed columns. The streaming
+# reader otherwise infers types from the first block only (e.g. Discount is 0 for
+# the first ~29k rows and would be read as int64). Dates stay strings here and
+# are parsed by the transform step.
+ARROW_COLUMN_TYPES = {} if pa is None else {
+    'row_id': pa.int64(), 'quantity': pa.int64(),
+    'sales': pa.float64(), 'discount': pa.float64(), 'profit': pa.float64(),
+    'shipping_cost': pa.float64(),
+    **{c: pa.string() for c in [
+        'order_id', 'order_date', 'ship_date', 'customer_id', 'customer_name', 'segment',
+        'product_id', 'product_name', 'category', 'sub_category', 'ship_mode',
+        'city', 'state', 'country', 'region', 'market', 'postal_code'
+    ]}
+}
 
 def get_db_connection():
     """Establishes connection to SQL Server."""
@@ -38,28 +105,85 @@ def get_db_connection():
         print(f"Connection failed: {e}")
         sys.exit(1)
 
-def extract_data(file_path):
-    """Reads the CSV file with error handling for encoding."""
+def _open_arrow_csv(file_path, usecols, encoding, norm):
+    """Opens Arrow's multithreaded streaming CSV reader.
+
+    ``norm`` maps raw header names to normalized names (used to pick column types).
+    Opening reads and decodes the first block, so encoding errors surface here.
+    """
+    column_types = {c: ARROW_COLUMN_TYPES[n] for c, n in norm.items() if n in ARROW_COLUMN_TYPES}
+    return pa_csv.open_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(encoding=encoding),
+        convert_options=pa_csv.ConvertOptions(include_columns=usecols or [], column_types=column_types,
+                                              strings_can_be_null=True)
+    )
+
+def _iter_arrow_csv(reader, chunksize):
+    """Yields DataFrames of ~chunksize rows from an open Arrow CSV reader."""
+    pending, rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= chunksize:
+            yield pa.Table.from_batches(pending).to_pandas()
+            pending, rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+def _read_csv(file_path, usecols=None, chunksize=None, **kwargs):
+    """Reads the CSV parsing the date columns, whatever their raw header spelling.
+
+    ``usecols`` takes normalized column names; names missing from the file are skipped.
+    """
+    header = pd.read_csv(file_path, nrows=0, **kwargs).columns
+    norm = {c: _COL_NORM.sub('_', c).lower() for c in header}
+    if usecols is not None:
+        usecols = [c for c in header if norm[c] in usecols]
+    date_cols = [c for c in (header if usecols is None else usecols) if norm[c] in DATE_COLS]
+    # pandas' Arrow engine cannot stream chunks; use Arrow's streaming reader directly.
+    # The reader is opened here (not inside the generator) so extract_data's
+    # encoding fallback sees open/decode errors.
+    if chunksize and pa_csv is not None:
+        reader = _open_arrow_csv(file_path, usecols, kwargs.get('encoding', 'utf8'), norm)
+        return _iter_arrow_csv(reader, chunksize)
+    engine = 'c' if chunksize else CSV_ENGINE
+    return pd.read_csv(file_path, engine=engine, usecols=usecols, parse_dates=date_cols,
+                       chunksize=chunksize, **kwargs)
+
+def extract_data(file_path, usecols=None, chunksize=None):
+    """Reads the CSV file with error handling for encoding.
+
+    With ``chunksize`` an iterator of DataFrames is returned instead.
+    """
     print(f"Extracting data from {file_path}...")
     if not os.path.exists(file_path):
         print(f"Error: File {file_path} not found.")
         sys.exit(1)
         
     try:
-        df = pd.read_csv(file_path, encoding='latin1')
+        df = _read_csv(file_path, usecols=usecols, chunksize=chunksize, encoding='latin1')
     except Exception:
         print("Latin1 encoding failed, trying default...")
-        df = pd.read_csv(file_path)
+        df = _read_csv(file_path, usecols=usecols, chunksize=chunksize)
     
-    print(f"Extracted {len(df)} rows.")
+    if chunksize is None:
+        print(f"Extracted {len(df)} rows.")
     return df
 
-def transform_data(df):
-    """Applies normalization and feature engineering."""
-    print("Transforming data...")
-    
-    # 1. Normalization
-    df.columns = df.columns.str.lower().str.replace('.', '_').str.replace(' ', '_').str.replace('-', '_')
+def _truncate(s, length):
+    """Truncates a string column, using the Arrow kernel when pyarrow is available."""
+    if pc is not None:
+        try:
+            arr = pa.array(s, type=pa.string(), from_pandas=True)
+            return pc.utf8_slice_codeunits(arr, 0, length).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass  # Mixed (non-string) values: fall back to pandas
+    return s.astype(str).str.slice(0, length)
+
+def normalize_data(df):
+    """Normalizes column names, ID casing, numeric and date types."""
+    df.columns = [_COL_NORM.sub('_', c).lower() for c in df.columns]
     
     # Normalize ID columns to uppercase for SQL case-insensitivity
     if 'customer_id' in df.columns:
@@ -67,93 +191,229 @@ def transform_data(df):
     if 'product_id' in df.columns:
         df['product_id'] = df['product_id'].astype(str).str.upper()
     
-    # 2. Type Conversion
-    df['order_date'] = pd.to_datetime(df['order_date'], errors='coerce')
-    df['ship_date'] = pd.to_datetime(df['ship_date'], errors='coerce')
+    # Type Conversion (columns with missing values are float and left as read)
+    for col in [c for c in DOWNCAST_INT_COLS if c in df.columns]:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    # Dates are parsed on read; coerce only what failed to parse
+    for col in [c for c in DATE_COLS if c in df.columns]:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    return df
+
+def finalize_strings(df):
+    """Casts low-cardinality columns to categoricals and truncates strings to fit the schema."""
+    # Low-cardinality columns as categoricals (string ops run on categories only)
+    for col in [c for c in CATEGORY_COLS if c in df.columns]:
+        df[col] = df[col].astype('category')
+
+    # Truncate string columns to fit schema (NVARCHAR(255))
+    str_cols = df.select_dtypes(include=['object']).columns
+    for col in str_cols:
+        df[col] = _truncate(df[col], 255)
+    cat_cols = df.select_dtypes(include=['category']).columns
+    for col in cat_cols:
+        df[col] = df[col].cat.rename_categories(lambda v: str(v)[:255])
+
+    return df
+
+def date_key(dates):
+    """Returns yyyymmdd integer keys shared by Dim_Date and Fact_Sales (NaT -> 0, the "Unknown" date)."""
+    dt = dates.dt
+    return (dt.year.fillna(0).astype(np.int64) * 10000
+            + dt.month.fillna(0).astype(np.int64) * 100
+            + dt.day.fillna(0).astype(np.int64))
+
+def transform_data(df, sales_threshold=None):
+    """Applies normalization and feature engineering.
+
+    ``sales_threshold`` overrides the 75th sales percentile computed from ``df``,
+    so chunks of a larger file can share the file-wide threshold.
+    """
+    print("Transforming data...")
+    
+    # 1-2. Normalization and Type Conversion
+    df = normalize_data(df)
     
     # 3. Feature Engineering from Notebook
     # Shipping Days
     df['shipping_days'] = (df['ship_date'] - df['order_date']).dt.days
-    df['shipping_days'] = df['shipping_days'].fillna(0)
+    df['shipping_days'] = df['shipping_days'].fillna(0).astype(np.int64)
     
-    # Profit Margin
-    with np.errstate(divide='ignore', invalid='ignore'):
-        df['profit_margin'] = (df['profit'] / df['sales']) * 100
-    df['profit_margin'] = df['profit_margin'].replace([np.inf, -np.inf], 0).fillna(0)
+    # Profit Margin (0 where sales is zero or either value is missing)
+    profit = df['profit'].to_numpy(dtype=np.float64)
+    sales = df['sales'].to_numpy(dtype=np.float64)
+    margin = np.zeros_like(profit)
+    np.divide(profit, sales, out=margin,
+              where=(sales != 0) & np.isfinite(profit) & np.isfinite(sales))
+    df['profit_margin'] = margin * 100.0
     
     # Is Profitable
-    df['is_profitable'] = np.where(df['profit'] > 0, 1, 0)
+    df['is_profitable'] = (profit > 0).view(np.int8)
     
     # Discount Category
-    def categorize_discount(discount):
-        if discount == 0: return 'No Discount'
-        elif discount < 0.2: return 'Low'
-        else: return 'High'
-    df['discount_category'] = df['discount'].apply(categorize_discount)
+    d = df['discount'].to_numpy()
+    df['discount_category'] = np.select(
+        [d == 0, d < 0.2], ['No Discount', 'Low'], default='High')
     
     # Order Value Segment
-    sales_threshold = df['sales'].quantile(0.75)
+    if sales_threshold is None:
+        sales_threshold = df['sales'].quantile(0.75)
     df['order_value_segment'] = np.where(df['sales'] > sales_threshold, 'High Value', 'Standard Value')
     
     # Extract Dimensional Integers (for DateKey)
-    df['date_key'] = df['order_date'].dt.strftime('%Y%m%d').fillna(0).astype(np.int64)
+    df['date_key'] = date_key(df['order_date'])
 
-    # Truncate string columns to fit schema (NVARCHAR(255))
-    str_cols = df.select_dtypes(include=['object']).columns
-    for col in str_cols:
-        df[col] = df[col].astype(str).str.slice(0, 255)
+    return finalize_strings(df)
 
-    return df
+def _to_rows(df):
+    """Converts a DataFrame to tuples of native Python types (NaN/NaT -> None)."""
+    cols = []
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            arr = np.array(s.dt.to_pydatetime(), dtype=object)
+        else:
+            arr = s.to_numpy(dtype=object)
+        mask = s.isna().to_numpy()
+        cols.append(np.where(mask, None, arr).tolist())
+    return list(zip(*cols))
+
+def _iter_chunks(df, chunksize):
+    """Yields lists of row tuples, materializing Python objects one chunk at a time."""
+    if pa is not None:
+        # Arrow converts NaN/NaT to nulls, which come out as None
+        tbl = pa.Table.from_pandas(df, preserve_index=False)
+        for i in range(0, tbl.num_rows, chunksize):
+            batch = tbl.slice(i, chunksize)
+            yield list(zip(*[c.to_pylist() for c in batch.columns]))
+    else:
+        for i in range(0, len(df), chunksize):
+            yield _to_rows(df.iloc[i:i+chunksize])
 
-def insert_data(engine, df, table_name, chunksize=1000):
+def insert_data(cursor, df, table_name, chunksize=10_000):
+    """Inserts df through the caller's cursor; committing is left to the caller."""
     print(f"Loading {table_name} ({len(df)} rows) via custom insert...")
     columns = df.columns.tolist()
     placeholders = ",".join(["?" for _ in columns])
     sql = f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})"
     
-    # Convert df to list of tuples, handling NaN/None
-    # Replace NaN with None for SQL NULL
-    data = df.where(pd.notnull(df), None).values.tolist()
-    
-    conn = engine.raw_connection()
-    cursor = conn.cursor()
+    # Bind each chunk as a parameter array (one round-trip per chunk)
+    cursor.fast_executemany = True
     try:
-        total = len(data)
-        for i in range(0, total, chunksize):
-            chunk = data[i:i+chunksize]
+        # fast_executemany is strict about types, so send native Python values
+        # with None for SQL NULL
+        for chunk in _iter_chunks(df, chunksize):
             cursor.executemany(sql, chunk)
-            conn.commit()
         print(f"Successfully loaded {table_name}")
     except Exception as e:
         print(f"Failed to load {table_name}: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        raise
+
+@functools.lru_cache(maxsize=None)
+def _find_bcp():
+    """Returns the SQL Server bcp executable, or None if BCP_PATH is unset or is another tool."""
+    if not BCP_PATH:
+        return None
+    bcp = shutil.which(BCP_PATH)
+    if bcp is None:
+        return None
+    # Other packages ship a 'bcp' too (e.g. Boost's libboost-tools-dev)
+    try:
+        result = subprocess.run([bcp, '-v'], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if 'SQL Server' not in result.stdout + result.stderr:
+        return None
+    return bcp
+
+def _clean_bcp_text(s):
+    """Replaces tabs/newlines (bcp's field and row terminators) in a string column."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Clean the categories only, unless that would merge two of them
+        cats = s.cat.categories.astype(str).str.replace(r'[\t\r\n]', ' ', regex=True)
+        if cats.is_unique:
+            return s.cat.rename_categories(cats)
+        s = s.astype(object)
+    return s.replace(r'[\t\r\n]', ' ', regex=True)
+
+def _bulk_load(df, table_name, batch_size=50_000):
+    """Loads a large table with SQL Server's bcp utility (see _find_bcp).
+
+    bcp runs in its own session, so its rows are committed per batch outside the
+    caller's transaction.
+    """
+    bcp = _find_bcp()
+    print(f"Loading {table_name} ({len(df)} rows) via bcp...")
+    fd, path = tempfile.mkstemp(suffix='.tsv')
+    os.close(fd)
+    try:
+        # Tabs/newlines inside values would break the field and row terminators;
+        # only the string columns are replaced on a shallow copy
+        data = df.copy(deep=False)
+        for col in df.select_dtypes(include=['object', 'category']).columns:
+            data[col] = _clean_bcp_text(df[col])
+        data.to_csv(path, sep='\t', index=False, header=False, na_rep='', encoding='utf-8')
+
+        result = subprocess.run(
+            [bcp, table_name, 'in', path, '-S', SERVER, '-d', DATABASE, '-T',
+             '-c', '-C', '65001', '-t', '\\t', '-b', str(batch_size)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stdout + result.stderr)
+        print(f"Successfully loaded {table_name}")
+    except Exception as e:
+        print(f"Failed to load {table_name}: {e}")
+        raise
     finally:
-        conn.close()
+        os.remove(path)
 
-def create_dimensions(df, engine):
-    """Creates and loads dimension tables."""
+def collect_dimension_data(chunks):
+    """Reduces first-pass chunks to the distinct dimension members.
+
+    Each chunk is deduplicated before the next one is read, so memory holds the
+    distinct customers/products/ship modes/locations, the per-chunk date bounds
+    and the sales column (needed for the file-wide quantile), not all N rows.
+    """
+    loc_cols = ['city', 'state', 'country', 'region', 'market', 'postal_code']
+    parts = {'order_date': [], 'customer': [], 'product': [], 'ship_mode': [], 'location': [], 'sales': []}
+    for chunk in chunks:
+        chunk = finalize_strings(normalize_data(chunk))
+        available_cols = [c for c in loc_cols if c in chunk.columns]
+        parts['order_date'].append(pd.Series([chunk['order_date'].min(), chunk['order_date'].max()]))
+        parts['customer'].append(chunk[['customer_id', 'customer_name', 'segment']]
+                                 .groupby('customer_id', as_index=False, sort=False).first())
+        parts['product'].append(chunk[['product_id', 'product_name', 'category', 'sub_category']]
+                                .groupby('product_id', as_index=False, sort=False).first())
+        parts['ship_mode'].append(chunk['ship_mode'].drop_duplicates())
+        parts['location'].append(chunk[available_cols].drop_duplicates())
+        parts['sales'].append(chunk['sales'])
+    return {k: pd.concat(v, ignore_index=True) for k, v in parts.items()}
+
+def create_dimensions(dim_data, cursor):
+    """Creates and loads dimension tables from collect_dimension_data's output."""
     print("Creating Dimensions...")
     
     # Helper to load safely
     def load_dim(data, table_name, pk_col):
-        insert_data(engine, data, table_name, chunksize=1000)
+        insert_data(cursor, data, table_name)
 
     # --- Dim_Date ---
-    min_date = df['order_date'].min()
-    max_date = df['order_date'].max()
+    min_date = dim_data['order_date'].min()
+    max_date = dim_data['order_date'].max()
     date_range = pd.date_range(start=min_date, end=max_date)
     dim_date = pd.DataFrame({'Date': date_range})
-    dim_date['DateKey'] = dim_date['Date'].dt.strftime('%Y%m%d').astype(int)
-    dim_date['Year'] = dim_date['Date'].dt.year
-    dim_date['Quarter'] = dim_date['Date'].dt.quarter
-    dim_date['Month'] = dim_date['Date'].dt.month
-    dim_date['MonthName'] = dim_date['Date'].dt.month_name()
-    dim_date['Day'] = dim_date['Date'].dt.day
-    dim_date['Weekday'] = dim_date['Date'].dt.day_name()
-    dim_date['Weekday'] = dim_date['Date'].dt.day_name()
-    dim_date['IsWeekend'] = dim_date['Date'].dt.dayofweek.isin([5, 6])
+    dt = dim_date['Date'].dt
+    dim_date = dim_date.assign(
+        DateKey=date_key(dim_date['Date']),
+        Year=dt.year, Quarter=dt.quarter, Month=dt.month,
+        MonthName=dt.month_name(), Day=dt.day,
+        Weekday=dt.day_name(),
+        IsWeekend=dt.dayofweek.to_numpy() >= 5,
+    )
     
     # Add scalar "Unknown" date
     unknown_date = pd.DataFrame([{
@@ -169,33 +429,35 @@ def create_dimensions(df, engine):
     load_dim(dim_date, 'Dim_Date', 'DateKey')
 
     # --- Dim_Customer ---
-    dim_customer = df[['customer_id', 'customer_name', 'segment']].drop_duplicates()
+    # Deduplicate by PK only (hashes one column) to avoid IntegrityError;
+    # chunks were already reduced, this merges members seen in several chunks
+    dim_customer = (dim_data['customer']
+                    .groupby('customer_id', as_index=False, sort=False).first())
     dim_customer.columns = ['CustomerID', 'CustomerName', 'Segment']
-    # Deduplicate by PK to avoid IntegrityError
-    dim_customer = dim_customer.drop_duplicates(subset=['CustomerID'])
     load_dim(dim_customer, 'Dim_Customer', 'CustomerID')
 
     # --- Dim_Product ---
-    dim_product = df[['product_id', 'product_name', 'category', 'sub_category']].drop_duplicates()
-    dim_product.columns = ['ProductID', 'ProductName', 'Category', 'SubCategory']
     # Deduplicate by PK
-    dim_product = dim_product.drop_duplicates(subset=['ProductID'])
+    dim_product = (dim_data['product']
+                   .groupby('product_id', as_index=False, sort=False).first())
+    dim_product.columns = ['ProductID', 'ProductName', 'Category', 'SubCategory']
     load_dim(dim_product, 'Dim_Product', 'ProductID')
 
     # --- Dim_ShipMode ---
-    dim_shipmode = df[['ship_mode']].drop_duplicates().reset_index(drop=True)
-    dim_shipmode['ShipModeID'] = dim_shipmode.index + 1
-    dim_shipmode.rename(columns={'ship_mode': 'ShipMode'}, inplace=True)
-    dim_shipmode = dim_shipmode[['ShipModeID', 'ShipMode']] # Reorder columns
+    # factorize yields the uniques and their surrogate keys in one pass
+    _, shipmodes = pd.factorize(dim_data['ship_mode'], sort=False)
+    dim_shipmode = pd.DataFrame({'ShipModeID': np.arange(1, len(shipmodes) + 1),
+                                 'ShipMode': shipmodes})
     load_dim(dim_shipmode, 'Dim_ShipMode', 'ShipModeID')
 
     # --- Dim_Location ---
-    # Smart handling of location columns
-    loc_cols = ['city', 'state', 'country', 'region', 'market', 'postal_code']
-    available_cols = [c for c in loc_cols if c in df.columns]
+    # Smart handling of location columns (collect_dimension_data kept those present)
+    available_cols = list(dim_data['location'].columns)
     
-    dim_location = df[available_cols].drop_duplicates().reset_index(drop=True)
-    dim_location['LocationID'] = dim_location.index + 1
+    _, locations = pd.MultiIndex.from_frame(dim_data['location']).factorize()
+    locations.names = available_cols  # factorize drops the level names
+    dim_location = locations.to_frame(index=False)
+    dim_location.insert(0, 'LocationID', np.arange(1, len(locations) + 1))
     
     if 'postal_code' in dim_location.columns:
         dim_location.rename(columns={'postal_code': 'PostalCode'}, inplace=True)
@@ -204,22 +466,28 @@ def create_dimensions(df, engine):
     schema_map = {'city': 'City', 'state': 'State', 'country': 'Country', 'region': 'Region', 'market': 'Market'}
     dim_location.rename(columns=schema_map, inplace=True)
     
-    # Order columns
-    cols = ['LocationID'] + [c for c in dim_location.columns if c != 'LocationID']
-    dim_location = dim_location[cols]
-    
     load_dim(dim_location, 'Dim_Location', 'LocationID')
     
     return dim_shipmode, dim_location
 
-def load_face_sales(df, dim_shipmode, dim_location, engine):
-    """Creates and loads the Fact_Sales table."""
+def _lookup_ids(dim_keys, keys, ids):
+    """Maps natural keys to surrogate IDs by position in the dimension index (missing -> NA)."""
+    pos = dim_keys.get_indexer(keys)
+    return pd.array(ids, dtype='Int64').take(pos, allow_fill=True)
+
+def load_face_sales(df, dim_shipmode, dim_location, cursor, seen_rows=None, use_bcp=False):
+    """Creates and loads the Fact_Sales table (or one chunk of it).
+
+    ``seen_rows`` collects RowIDs already loaded by earlier chunks so the PK stays unique.
+    """
     print("Creating Fact_Sales...")
     
-    fact = df.copy()
-    
-    # Join Keys
-    fact = fact.merge(dim_shipmode, left_on='ship_mode', right_on='ShipMode', how='left')
+    # Join Keys: hash lookups into the dimension keys instead of merges
+    # (the dimensions were built in a separate pass over the file)
+    df['ShipModeID'] = _lookup_ids(
+        pd.Index(dim_shipmode['ShipMode'].astype(object)),
+        pd.Index(df['ship_mode'].astype(object)),
+        dim_shipmode['ShipModeID'].to_numpy())
     
     loc_cols = ['city', 'state', 'country', 'region', 'market', 'postal_code']
     left_keys = [c for c in loc_cols if c in df.columns]
@@ -230,17 +498,29 @@ def load_face_sales(df, dim_shipmode, dim_location, engine):
         if k == 'postal_code': right_keys.append('PostalCode')
         elif k in schema_map: right_keys.append(schema_map[k])
         else: right_keys.append(k)
-        
-    fact = fact.merge(dim_location, left_on=left_keys, right_on=right_keys, how='left')
     
-    fact.rename(columns={
+    df['LocationID'] = _lookup_ids(
+        pd.MultiIndex.from_frame(dim_location[right_keys].astype(object)),
+        pd.MultiIndex.from_frame(df[left_keys].astype(object)),
+        dim_location['LocationID'].to_numpy())
+    
+    # Select only the columns used downstream instead of copying the whole frame
+    src_cols = [
+        'row_id', 'order_id', 'date_key', 'customer_id', 'product_id', 'LocationID', 'ShipModeID',
+        'sales', 'quantity', 'discount', 'profit', 'shipping_cost',
+        'shipping_days', 'profit_margin', 'is_profitable', 'discount_category', 'order_value_segment'
+    ]
+    fact = df[src_cols].rename(columns={
         'row_id': 'RowID', 'order_id': 'OrderID', 'sales': 'Sales', 'quantity': 'Quantity',
         'discount': 'Discount', 'profit': 'Profit', 'shipping_cost': 'ShippingCost',
         'date_key': 'DateKey', 'customer_id': 'CustomerID', 'product_id': 'ProductID'
-    }, inplace=True)
+    })
     
     # Deduplicate RowID for PK constraint
     fact = fact.drop_duplicates(subset=['RowID'])
+    if seen_rows is not None:
+        fact = fact[~fact['RowID'].isin(seen_rows)]
+        seen_rows.update(fact['RowID'].tolist())
     
     fact_cols = [
         'RowID', 'OrderID', 'DateKey', 'CustomerID', 'ProductID', 'LocationID', 'ShipModeID',
@@ -250,8 +530,40 @@ def load_face_sales(df, dim_shipmode, dim_location, engine):
     
     final_fact = fact[fact_cols]
     
-    # Custom Insert for Fact
-    insert_data(engine, final_fact, 'Fact_Sales', chunksize=1000)
+    # Bulk copy for Fact when available (dimensions are small enough for executemany)
+    if use_bcp:
+        _bulk_load(final_fact, 'Fact_Sales')
+    else:
+        insert_data(cursor, final_fact, 'Fact_Sales')
+
+def _resolve_schema_path():
+    """Returns the first existing schema script location (project root or etl/)."""
+    candidates = ('sql/schema.sql', os.path.join('sql', 'schema.sql'), os.path.join('..', 'sql', 'schema.sql'))
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"Schema script not found in any of: {', '.join(candidates)}")
+
+def _driver_connection(conn):
+    """Returns the pyodbc connection behind a SQLAlchemy pooled connection.
+
+    Attributes such as ``autocommit`` must be set here; on the pool proxy they are a no-op.
+    """
+    return getattr(conn, 'driver_connection', None) or conn.dbapi_connection
+
+def _truncate_table(engine, table_name):
+    """Empties a table through a separate autocommit connection."""
+    print(f"Removing rows committed to {table_name} by bcp...")
+    conn = engine.raw_connection()
+    dbapi_conn = _driver_connection(conn)
+    try:
+        dbapi_conn.autocommit = True
+        conn.cursor().execute(f"TRUNCATE TABLE {table_name}")
+    except Exception as e:
+        print(f"Failed to truncate {table_name}: {e}")
+    finally:
+        dbapi_conn.autocommit = False
+        conn.close()
 
 def execute_schema_script(engine, script_path):
     """Executes the DDL script to create tables."""
@@ -260,18 +572,27 @@ def execute_schema_script(engine, script_path):
         with open(script_path, 'r', encoding='utf-8') as f:
             sql_script = f.read()
             
+        # Remove BOM if present
         sql_script = sql_script.replace('\ufeff', '')
-        statements = sql_script.split(';')
+        # Send the script as one batch per GO separator (semicolons are left
+        # to the server, so procedure bodies are not split)
+        batches = _GO_SEP.split(sql_script)
         
         conn = engine.raw_connection()
+        dbapi_conn = _driver_connection(conn)
         try:
+            dbapi_conn.autocommit = True
             cursor = conn.cursor()
-            for statement in statements:
-                if statement.strip():
-                    cursor.execute(statement)
-            conn.commit()
+            for batch in batches:
+                if batch.strip():
+                    cursor.execute(batch)
+                    # Drain result sets so errors in later statements surface
+                    while cursor.nextset():
+                        pass
             print("Schema created successfully.")
         finally:
+            # Back to manual commit before the connection returns to the pool
+            dbapi_conn.autocommit = False
             conn.close()
             
     except Exception as e:
@@ -286,56 +607,59 @@ def main():
     # 0. Connect
     engine = get_db_connection()
     
-    # 1. Initialize Schema (Drop & Create)
-    # This will drop tables first because schema.sql has DROP if exists
     # 1. Initialize Schema (Drop & Create)
     # This will drop tables first because schema.sql has DROP if exists
     print("Initializing Database Schema...")
     try:
-        # Re-implementing schema execution directly here for standalone script
-        # based on successful setup_db.py logic
-        
-        script_path = 'sql/schema.sql'
-        if not os.path.exists(script_path):
-             # Handle case where run from root
-             if os.path.exists(os.path.join('sql', 'schema.sql')):
-                 script_path = os.path.join('sql', 'schema.sql')
-             elif os.path.exists(os.path.join('..', 'sql', 'schema.sql')):
-                 script_path = os.path.join('..', 'sql', 'schema.sql')
+        script_path = _resolve_schema_path()
+    except FileNotFoundError as e:
+        print(f"Schema setup failed: {e}")
+        sys.exit(1)
+    execute_schema_script(engine, script_path)
 
-        with open(script_path, 'r', encoding='utf-8') as f:
-            sql_script = f.read()
+    # 2. Extract dimension attributes (narrow, chunked first pass over the file)
+    dim_data = collect_dimension_data(extract_data(CSV_PATH, usecols=DIM_SRC_COLS, chunksize=CHUNK_SIZE))
+    sales_threshold = dim_data.pop('sales').quantile(0.75)
+    
+    # Load in a single transaction (one log flush at commit). When bcp is used,
+    # Fact_Sales rows are committed by bcp's own session instead, so a failed
+    # run empties Fact_Sales explicitly after rolling back the dimensions.
+    use_bcp = _find_bcp() is not None
+    if not use_bcp:
+        print("SQL Server bcp utility not found, loading Fact_Sales via executemany...")
+    conn = engine.raw_connection()
+    _driver_connection(conn).autocommit = False
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET NOCOUNT ON")
         
-        # Remove BOM if present
-        sql_script = sql_script.replace('\ufeff', '')
-        statements = sql_script.split(';')
+        # 3. Load Dimensions
+        dim_shipmode, dim_location = create_dimensions(dim_data, cursor)
+        del dim_data
         
-        conn = engine.raw_connection()
-        cursor = conn.cursor()
-        try:
-            for statement in statements:
-                if statement.strip():
-                    cursor.execute(statement)
-            conn.commit()
-            print("Schema created successfully.")
-        finally:
-            conn.close()
-            
+        # 4. Transform and Load Fact, one chunk at a time. Memory per chunk is
+        # bounded by CHUNK_SIZE; seen_rows still grows with the number of RowIDs.
+        # FK checks are deferred to a single validation scan after the load
+        # (bcp skips them by default; the ALTER would block its session)
+        if not use_bcp:
+            cursor.execute("ALTER TABLE Fact_Sales NOCHECK CONSTRAINT ALL")
+        seen_rows = set()
+        for chunk in extract_data(CSV_PATH, usecols=FACT_SRC_COLS, chunksize=CHUNK_SIZE):
+            chunk = transform_data(chunk, sales_threshold)
+            load_face_sales(chunk, dim_shipmode, dim_location, cursor, seen_rows, use_bcp)
+        cursor.execute("ALTER TABLE Fact_Sales WITH CHECK CHECK CONSTRAINT ALL")
+        
+        conn.commit()
     except Exception as e:
-        print(f"Schema setup failed: {e}")
+        conn.rollback()
+        print(f"Load failed, transaction rolled back: {e}")
+        import traceback
+        traceback.print_exc()
+        if use_bcp:
+            _truncate_table(engine, 'Fact_Sales')
         sys.exit(1)
-
-    # 2. Extract
-    df = extract_data(CSV_PATH)
-    
-    # 3. Transform
-    df_transformed = transform_data(df)
-    
-    # 4. Load Dimensions
-    dim_shipmode, dim_location = create_dimensions(df_transformed, engine)
-    
-    # 5. Load Fact
-    load_face_sales(df_transformed, dim_shipmode, dim_location, engine)
+    finally:
+        conn.close()
     
     print("ETL Pipeline Completed Successfully.")
 